@@ -1,30 +1,9 @@
 # for tasking system to ensure only one migration is run at a time
 PULP_2TO3_MIGRATION_RESOURCE = 'pulp_2to3_migration'
 
-# Pulp2 plugins and their content types which can be migrated
-# 'pulp2_plugin': 'pulp2 model class name'
-SUPPORTED_PULP2_PLUGINS = {
-    'iso': ['ISO'],
-    # 'rpm': [
-    #     'Distribution',
-    #     'Drpm',
-    #     'Erratum',
-    #     'Modulemd',
-    #     'ModulemdDefaults',
-    #     'PackageCategory',
-    #     'PackageEnvironment',
-    #     'PackageGroup',
-    #     'PackageLangpacks',
-    #     'Rpm',
-    #     'Srpm',
-    #     'YumRepoMetadataFile'],
-    # 'docker': [
-    #     'Blob',
-    #     'Image',
-    #     'Manifest',
-    #     'ManifestList',
-    #     'Tag'],
-}
+# Entry point group where Pulp 2 plugins register their content migrators
+# 'pulp2 plugin' = 'package.module:tuple of ContentMigrator descriptors'
+MIGRATOR_ENTRY_POINT_GROUP = 'pulp_2to3_migrate.migrators'
 
 # Mapping Pulp 2 content type to Pulp 3 plugin and content type
 # 'pulp2 content type id' -> ('pulp3 plugin', 'pulp3 content type')
@@ -33,3 +12,13 @@ PULP_2TO3_TYPE_MAP = {
     # 'erratum': ('rpm', 'advisory'),
     # 'rpm': ('rpm': 'package'),
 }
+
+# Location of Pulp 2 content on the shared /var/lib/pulp mount, units of each content type are
+# stored in its units/<content type> subdirectory
+PULP2_CONTENT_ROOT = '/var/lib/pulp/content'
+
+# Number of threads which walk the Pulp 2 storage in parallel during a pre-scan
+STORAGE_SCAN_WORKERS = 16
+
+# Name of the on-disk storage index, it's created in a task working directory
+STORAGE_INDEX_FILENAME = 'pulp2_storage_index.sqlite3'
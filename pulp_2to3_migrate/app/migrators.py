@@ -0,0 +1,190 @@
+import importlib
+import logging
+
+from functools import lru_cache
+from gettext import gettext as _
+
+import pkg_resources
+
+from django.apps import apps
+from pulpcore.plugin.models import Content
+
+from pulp_2to3_migrate.app.constants import MIGRATOR_ENTRY_POINT_GROUP, PULP_2TO3_TYPE_MAP
+from pulp_2to3_migrate.exceptions import ConfigurationError
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_STAGES = (
+    'pulp_2to3_migrate.app.tasks.migrate:migrate_content_generic_info',
+)
+
+
+def _import_object(path):
+    """
+    Import an object by its path.
+
+    Args:
+        path (str): Path to an object in the 'package.module:name' format
+
+    Returns:
+        The imported object
+    """
+    module_path, name = path.split(':')
+    return getattr(importlib.import_module(module_path), name)
+
+
+class ContentMigrator:
+    """
+    Descriptor of a migration for one Pulp 2 content type.
+
+    Nothing is imported when a descriptor is created, the Pulp 2 model and stages are imported
+    on the first access only.
+
+    Attributes:
+        pulp2_plugin (str): Name of a Pulp 2 plugin the content type belongs to
+        pulp2_content_type (str): Content type in Pulp 2, a key in PULP_2TO3_TYPE_MAP
+        pulp2_fields (tuple): Content type specific fields of a Pulp 2 model to read from Mongo
+        batch_size (int): Number of content units to process at once
+    """
+
+    def __init__(self, pulp2_plugin, pulp2_content_type, pulp2_model, pulp2_fields=(),
+                 batch_size=10000, stages=DEFAULT_STAGES):
+        """
+        Args:
+            pulp2_plugin (str): Name of a Pulp 2 plugin the content type belongs to
+            pulp2_content_type (str): Content type in Pulp 2
+            pulp2_model (str): Path to a Pulp 2 model in the 'package.module:name' format
+            pulp2_fields (tuple): Content type specific fields of a Pulp 2 model
+            batch_size (int): Number of content units to process at once
+            stages (tuple): Paths to stage coroutines in the 'package.module:name' format, in
+                            the order they should be run
+        """
+        self.pulp2_plugin = pulp2_plugin
+        self.pulp2_content_type = pulp2_content_type
+        self.pulp2_fields = tuple(pulp2_fields)
+        self.batch_size = batch_size
+        self._pulp2_model_path = pulp2_model
+        self._stage_paths = tuple(stages)
+
+    def __repr__(self):
+        return '<{cls}: {type}>'.format(cls=type(self).__name__, type=self.pulp2_content_type)
+
+    @property
+    def pulp3_target(self):
+        """
+        Returns:
+            tuple: Pulp 3 plugin and content type the Pulp 2 content type is migrated to
+        """
+        return PULP_2TO3_TYPE_MAP[self.pulp2_content_type]
+
+    @property
+    def pulp3_content_model(self):
+        """
+        Returns:
+            Pulp 3 content model of the target plugin and content type, found by its app label
+            and TYPE
+
+        Raises:
+            ConfigurationError: If the target Pulp 3 plugin is not installed or has no such
+                                content type
+        """
+        pulp3_plugin, pulp3_content_type = self.pulp3_target
+        try:
+            app_config = apps.get_app_config(pulp3_plugin)
+        except LookupError:
+            raise ConfigurationError(
+                _('Pulp 3 {plugin} plugin is not installed.').format(plugin=pulp3_plugin))
+        for model in app_config.get_models():
+            if issubclass(model, Content) and model.TYPE == pulp3_content_type:
+                return model
+        raise ConfigurationError(
+            _('Pulp 3 {plugin} plugin has no {type} content type.').format(
+                plugin=pulp3_plugin, type=pulp3_content_type))
+
+    @property
+    def pulp2_model(self):
+        """
+        Returns:
+            Pulp 2 model for the content type, imported on the first access
+        """
+        if not hasattr(self, '_pulp2_model'):
+            self._pulp2_model = _import_object(self._pulp2_model_path)
+        return self._pulp2_model
+
+    @property
+    def stages(self):
+        """
+        Returns:
+            list: Stage coroutines to migrate the content type, imported on the first access
+        """
+        if not hasattr(self, '_stages'):
+            self._stages = [_import_object(path) for path in self._stage_paths]
+        return self._stages
+
+
+class MigratorRegistry:
+    """
+    Registry of content migrators provided by Pulp 2 plugins.
+
+    Plugins register a tuple of ContentMigrator descriptors under their Pulp 2 plugin name in the
+    MIGRATOR_ENTRY_POINT_GROUP entry point group. Entry points are only loaded when migrators
+    for a plugin are requested.
+    """
+
+    def __init__(self, group=MIGRATOR_ENTRY_POINT_GROUP):
+        """
+        Args:
+            group (str): Entry point group to discover plugin migrators in
+        """
+        self._entry_points = {ep.name: ep for ep in pkg_resources.iter_entry_points(group)}
+        self._migrators = {}
+
+    @property
+    def plugins(self):
+        """
+        Returns:
+            list: Names of Pulp 2 plugins which can be migrated
+        """
+        return sorted(self._entry_points)
+
+    def get_migrators(self, plugin):
+        """
+        Get content migrators for a Pulp 2 plugin.
+
+        Args:
+            plugin (str): Name of a Pulp 2 plugin
+
+        Returns:
+            tuple: ContentMigrator descriptors for all the content types of the plugin
+
+        Raises:
+            ConfigurationError: If migration of the plugin is not supported or the plugin
+                                registered migrators of another plugin
+        """
+        if plugin not in self._migrators:
+            try:
+                entry_point = self._entry_points[plugin]
+            except KeyError:
+                raise ConfigurationError(
+                    _('Migration of the {plugin} plugin is not supported.').format(plugin=plugin))
+            _logger.debug('Loading migrators for the {plugin} plugin.'.format(plugin=plugin))
+            migrators = tuple(entry_point.load())
+            for migrator in migrators:
+                if migrator.pulp2_plugin != plugin:
+                    raise ConfigurationError(
+                        _('Migrator for {type} content belongs to the {other} plugin, but it is '
+                          'registered for the {plugin} plugin.').format(
+                              type=migrator.pulp2_content_type,
+                              other=migrator.pulp2_plugin,
+                              plugin=plugin))
+            self._migrators[plugin] = migrators
+        return self._migrators[plugin]
+
+
+@lru_cache(maxsize=None)
+def get_registry():
+    """
+    Returns:
+        MigratorRegistry: Registry of content migrators, created on the first call
+    """
+    return MigratorRegistry()
@@ -1,6 +1,6 @@
 from django.db import models
 
-from pulpcore.plugin.models import Model
+from pulpcore.plugin.models import BaseDistribution, Content, Model, Publication, Repository
 
 
 class MigrationPlan(Model):
@@ -17,7 +17,8 @@ class Pulp2Content(Model):
     """
     General info about Pulp 2 content.
 
-    Pulp3 plugin models should create a Foreign key to this model.
+    Pulp 3 content created for it by a migration stage is linked through the `pulp3_content`
+    field, Pulp 3 content models don't need a Foreign key to this model.
 
     Fields:
         pulp2_id (models.UUIDField): Content ID in Pulp 2
@@ -25,9 +26,40 @@ class Pulp2Content(Model):
         pulp2_last_updated (models.PositiveIntegerField): Content creation or update time in Pulp 2
         pulp2_storage_path (models.TextField): Content storage path on Pulp 2 system
         downloaded (models.BooleanField): Flag to identify if content is on a filesystem or not
+
+    Relations:
+        pulp3_content (models.ForeignKey): Pulp 3 content this Pulp 2 content was migrated to
     """
     pulp2_id = models.UUIDField()
     pulp2_content_type_id = models.CharField(max_length=255)
     pulp2_last_updated = models.PositiveIntegerField()
     pulp2_storage_path = models.TextField()
     downloaded = models.BooleanField(default=True)
+
+    pulp3_content = models.ForeignKey(Content, on_delete=models.SET_NULL, null=True,
+                                      related_name='pulp2content')
+
+    class Meta:
+        unique_together = ('pulp2_id', 'pulp2_content_type_id')
+
+
+class Pulp2Repository(Model):
+    """
+    Pulp 2 repositories which have been migrated to Pulp 3.
+
+    Only repositories and distributions linked here are published and distributed by the
+    migration, any other Pulp 3 repositories and distributions are left untouched.
+
+    Fields:
+        pulp2_repo_id (models.CharField): Repository ID in Pulp 2
+
+    Relations:
+        pulp3_repository (models.ForeignKey): Pulp 3 repository created by the migration
+        pulp3_publication (models.ForeignKey): Pulp 3 publication created by the migration
+        pulp3_distribution (models.ForeignKey): Pulp 3 distribution created by the migration
+    """
+    pulp2_repo_id = models.CharField(max_length=255, unique=True)
+
+    pulp3_repository = models.ForeignKey(Repository, on_delete=models.SET_NULL, null=True)
+    pulp3_publication = models.ForeignKey(Publication, on_delete=models.SET_NULL, null=True)
+    pulp3_distribution = models.ForeignKey(BaseDistribution, on_delete=models.SET_NULL, null=True)
@@ -1,12 +1,12 @@
 import asyncio
-import importlib
 import logging
 import time
 
 from django.db.models import Max
 
-from pulp_2to3_migrate.app.constants import SUPPORTED_PULP2_PLUGINS
+from pulp_2to3_migrate.app.migrators import get_registry
 from pulp_2to3_migrate.app.models import Pulp2Content
+from pulp_2to3_migrate.app.tasks.prescan import prescan_pulp2_storage
 from pulp_2to3_migrate.pulp2 import connection
 
 _logger = logging.getLogger(__name__)
@@ -33,48 +33,68 @@ def migrate_from_pulp2(migration_plan_pk, dry_run=False):
     # For now, the list of plugins to migrate is hard-coded.
     plugins_to_migrate = ['iso']
 
-    # import all pulp 2 content models
-    content_models = []
-    for plugin, model_names in SUPPORTED_PULP2_PLUGINS.items():
-        if plugin not in plugins_to_migrate:
-            continue
-        module_path = 'pulp_2to3_migrate.pulp2.{plugin}.models'.format(plugin=plugin)
-        module = importlib.import_module(module_path)
-        for content_model_name in model_names:
-            content_models.append(getattr(module, content_model_name))
+    # only migrators of the plugins in the plan are loaded
+    registry = get_registry()
+    migrators = []
+    for plugin in plugins_to_migrate:
+        migrators.extend(registry.get_migrators(plugin))
 
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(migrate_content(content_models))
-    #loop.run_until_complete(migrate_repositories())
-    loop.close()
+    storage_index = prescan_pulp2_storage(
+        [migrator.pulp2_content_type for migrator in migrators])
+    try:
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(migrate_content(migrators, storage_index))
+        #loop.run_until_complete(migrate_repositories())
+        loop.close()
+    finally:
+        storage_index.close()
 
 
-async def migrate_content(content_models):
+async def migrate_content(migrators, storage_index):
     """
-    Coroutine to initiate content migration for each plugin.
+    Coroutine to initiate content migration for each content type.
+
+    Content types are migrated concurrently, the first failure of any stage is raised.
 
     Args:
-         content_models: List of Pulp 2 content models to migrate data for
+         migrators (list): ContentMigrator descriptors of content types to migrate
+         storage_index (StorageIndex): Index of Pulp 2 storage
     """
-    migrators =[]
-    for model in content_models:
-        _logger.debug('Migrating generic info for {type} content'.format(type=model.type))
-        migrator.append(migrate_content_generic_info(model))
+    await asyncio.gather(*[run_content_stages(migrator, storage_index) for migrator in migrators])
 
-    await asyncio.wait(migrators)
+    # schedule content migration (hard links or copy)
 
-    # schedule content migration (hard links or copy; plugin specific content creation)
 
+async def run_content_stages(migrator, storage_index):
+    """
+    Coroutine to run all migration stages of one content type in order.
 
-async def migrate_content_generic_info(content_model):
+    Args:
+        migrator (ContentMigrator): Descriptor of a content type to migrate
+        storage_index (StorageIndex): Index of Pulp 2 storage
+    """
+    for stage in migrator.stages:
+        _logger.debug('Running {stage} for {type} content'.format(
+            stage=stage.__name__,
+            type=migrator.pulp2_content_type))
+        await stage(migrator, storage_index)
+
+
+async def migrate_content_generic_info(migrator, storage_index):
     """
     Coroutine to migrate generic info about any Pulp 2 content.
 
+    Content is considered downloaded only if its file is present in Pulp 2 storage and, if
+    the content type has a size, the file is of that size. Missing and mismatched files are
+    reported.
+
     Args:
-        content_model: Pulp 2 model for content which is being migrated.
+        migrator (ContentMigrator): Descriptor of a content type which is being migrated.
+        storage_index (StorageIndex): Index of Pulp 2 storage
     """
-    batch_size = 10000
-    content_type = content_model.type
+    batch_size = migrator.batch_size
+    content_model = migrator.pulp2_model
+    content_type = migrator.pulp2_content_type
     pulp2_content = []
 
     # the latest timestamp we have in the migration tool Pulp2Content table for this content type
@@ -91,16 +111,39 @@ async def migrate_content_generic_info(content_model):
         type=content_type,
         total=total_content))
 
-    for i, record in enumerate(mongo_content_qs.only('id',
-                                                     '_storage_path',
-                                                     '_last_updated',
-                                                     '_content_type_id',
-                                                     'downloaded').batch_size(batch_size)):
+    fields = ['id', '_storage_path', '_last_updated', '_content_type_id', 'downloaded']
+    check_size = 'size' in migrator.pulp2_fields
+    if check_size:
+        fields.append('size')
+
+    missing = 0
+    mismatched = 0
+    for i, record in enumerate(mongo_content_qs.only(*fields).batch_size(batch_size)):
+        storage_path = record['_storage_path']
+        downloaded = False
+        if record['downloaded']:
+            file_record = storage_index.get(storage_path)
+            if file_record is None:
+                _logger.warning('{type} content {id} is missing on disk: {path}'.format(
+                    type=content_type, id=record['id'], path=storage_path))
+                missing += 1
+            elif check_size and file_record[0] != record['size']:
+                _logger.warning('{type} content {id} has wrong size on disk: {path}, '
+                                'expected {expected}, found {found}'.format(
+                                    type=content_type,
+                                    id=record['id'],
+                                    path=storage_path,
+                                    expected=record['size'],
+                                    found=file_record[0]))
+                mismatched += 1
+            else:
+                downloaded = True
+
         item = Pulp2Content(pulp2_id=record['id'],
                             pulp2_content_type_id=record['_content_type_id'],
                             pulp2_last_updated=record['_last_updated'],
-                            pulp2_storage_path=record['_storage_path'],
-                            downloaded=record['downloaded'])
+                            pulp2_storage_path=storage_path,
+                            downloaded=downloaded)
         _logger.debug('Add content item to the list to migrate: {item}'.format(item=item))
         pulp2_content.append(item)
 
@@ -109,4 +152,35 @@ async def migrate_content_generic_info(content_model):
             _logger.debug('Bulk save for generic content info, saved so far: {index}'.format(
                 index=i+1))
             Pulp2Content.objects.bulk_create(pulp2_content, ignore_conflicts=True)
-            pulp2_content = []
\ No newline at end of file
+            pulp2_content = []
+
+    _logger.info('Pulp 2 storage check for {type} content: {missing} missing, {mismatched} '
+                 'mismatched files.'.format(type=content_type,
+                                            missing=missing,
+                                            mismatched=mismatched))
+
+
+def pulp2_content_batches(content_type, batch_size):
+    """
+    Iterate over Pulp 2 content which is not migrated to Pulp 3 yet.
+
+    Content is read in the primary key order, one query per batch, so memory usage is bounded
+    by the batch size and not by the total amount of content.
+
+    Args:
+        content_type (str): Pulp 2 content type to iterate over
+        batch_size (int): Number of Pulp2Content rows in a batch
+
+    Yields:
+        list: A batch of Pulp2Content rows
+    """
+    content_qs = Pulp2Content.objects.filter(pulp2_content_type_id=content_type,
+                                             pulp3_content=None).order_by('pk')
+    last_pk = None
+    while True:
+        batch_qs = content_qs if last_pk is None else content_qs.filter(pk__gt=last_pk)
+        batch = list(batch_qs[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
@@ -0,0 +1,142 @@
+import logging
+import os
+import sqlite3
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pulp_2to3_migrate.app.constants import (
+    PULP2_CONTENT_ROOT,
+    STORAGE_INDEX_FILENAME,
+    STORAGE_SCAN_WORKERS,
+)
+
+_logger = logging.getLogger(__name__)
+
+# number of directory scans submitted per worker thread at a time
+SCAN_QUEUE_FACTOR = 4
+
+
+class StorageIndex:
+    """
+    On-disk index of files found in Pulp 2 storage.
+
+    Each record maps a file path to its size, inode and device, so migration stages can check
+    a file with a single indexed lookup instead of calling `stat` on a shared filesystem for every
+    single file. Records are kept in an SQLite table keyed on the path, nothing is held in memory.
+    """
+
+    def __init__(self, path, create=False):
+        """
+        Args:
+            path (str): Path to the index file
+            create (bool): If True, a new empty index is created, an existing one is overwritten
+        """
+        self.path = path
+        if create and os.path.exists(path):
+            os.remove(path)
+        self._db = sqlite3.connect(path)
+        if create:
+            self._db.execute('CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, '
+                             'inode INTEGER, device INTEGER) WITHOUT ROWID')
+
+    def add(self, records):
+        """
+        Add file records to the index.
+
+        Args:
+            records (list): (path, size, inode, device) tuples of files
+        """
+        self._db.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)', records)
+
+    def get(self, path):
+        """
+        Look up a file record in the index.
+
+        Args:
+            path (str): Absolute path of a file
+
+        Returns:
+            tuple: (size, inode, device) of a file or None if it's not in the index
+        """
+        return self._db.execute('SELECT size, inode, device FROM files WHERE path = ?',
+                                (path,)).fetchone()
+
+    def __contains__(self, path):
+        return self.get(path) is not None
+
+    def close(self):
+        """
+        Commit and close the index.
+        """
+        self._db.commit()
+        self._db.close()
+
+
+def _scan_directory(path):
+    """
+    Scan one directory of Pulp 2 storage.
+
+    Args:
+        path (str): Path of a directory to scan
+
+    Returns:
+        tuple: A list of (path, size, inode, device) records for files and a list of
+               subdirectories to scan next
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append((entry.path, stat.st_size, stat.st_ino, stat.st_dev))
+    except OSError as exc:
+        _logger.warning('Unable to scan {path}: {error}'.format(path=path, error=exc))
+    return files, subdirs
+
+
+def prescan_pulp2_storage(content_types, index_path=STORAGE_INDEX_FILENAME,
+                          workers=STORAGE_SCAN_WORKERS):
+    """
+    Walk Pulp 2 storage in parallel and build an on-disk index of all the files found.
+
+    Only directories of the content types which are migrated are walked. Directories are scanned
+    concurrently, depth first, and at most `workers * SCAN_QUEUE_FACTOR` of them are submitted at
+    a time, so the number of pending scans stays bounded. Only the calling thread writes to
+    the index.
+
+    Args:
+        content_types (list): Pulp 2 content types to scan storage for
+        index_path (str): Path to the index file to create, an existing one is overwritten
+        workers (int): Number of directories to scan concurrently
+
+    Returns:
+        StorageIndex: Index of Pulp 2 storage opened for reading
+    """
+    roots = [os.path.join(PULP2_CONTENT_ROOT, 'units', content_type)
+             for content_type in content_types]
+    _logger.debug('Scanning Pulp 2 storage at {roots}'.format(roots=', '.join(roots)))
+    index = StorageIndex(index_path, create=True)
+    total_files = 0
+
+    max_pending = workers * SCAN_QUEUE_FACTOR
+    paths = list(roots)
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while paths or pending:
+            while paths and len(pending) < max_pending:
+                pending.add(executor.submit(_scan_directory, paths.pop()))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                index.add(files)
+                total_files += len(files)
+                paths.extend(subdirs)
+
+    index.close()
+    _logger.debug('Indexed {total} files in Pulp 2 storage.'.format(total=total_files))
+    return StorageIndex(index_path)
+
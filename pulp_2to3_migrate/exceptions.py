@@ -16,4 +16,20 @@ class ConfigurationError(PulpException):
         self.msg = msg
 
     def __str__(self):
-        return self.msg
\ No newline at end of file
+        return self.msg
+
+
+class PublicationError(PulpException):
+    """
+    Exception that is raised when a publication for migrated content can't be created.
+    """
+    def __init__(self, msg):
+        """
+        :param msg: error message specifying why the publication failed
+        :type msg: str
+        """
+        super().__init__("PLP_2TO3_0002")
+        self.msg = msg
+
+    def __str__(self):
+        return self.msg
@@ -0,0 +1,16 @@
+from pulp_2to3_migrate.app.migrators import DEFAULT_STAGES, ContentMigrator
+
+MIGRATORS = (
+    ContentMigrator(
+        pulp2_plugin='iso',
+        pulp2_content_type='iso',
+        pulp2_model='pulp_2to3_migrate.pulp2.iso.models:ISO',
+        pulp2_fields=('name', 'checksum', 'size'),
+        batch_size=10000,
+        stages=DEFAULT_STAGES + (
+            'pulp_2to3_migrate.pulp2.iso.stages:migrate_iso_content',
+            # TODO: add 'pulp_2to3_migrate.pulp2.iso.stages:migrate_iso_publications' once
+            # repositories are migrated and recorded in Pulp2Repository
+        ),
+    ),
+)
@@ -0,0 +1,284 @@
+import logging
+
+from gettext import gettext as _
+
+from django.core.files import File
+from django.db import transaction
+
+from pulpcore.plugin.models import BaseDistribution, ContentArtifact, PublishedMetadata
+from pulp_file.app.models import FileContent, FileDistribution, FilePublication
+from pulp_file.manifest import Entry, Manifest
+
+from pulp_2to3_migrate.app.models import Pulp2Content, Pulp2Repository
+from pulp_2to3_migrate.app.tasks.migrate import pulp2_content_batches
+from pulp_2to3_migrate.exceptions import PublicationError
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'PULP_MANIFEST'
+
+# bulk_update() builds a CASE WHEN per row, keep each UPDATE statement small
+UPDATE_BATCH_SIZE = 500
+
+
+async def migrate_iso_content(migrator, storage_index):
+    """
+    Coroutine to create Pulp 3 File content for migrated Pulp 2 ISO content.
+
+    Pulp2Content rows which are not linked to Pulp 3 content yet are processed in batches, each
+    batch is committed in its own transaction. Artifacts are not created here, ContentArtifacts
+    are created without them until files are moved to Pulp 3 storage.
+
+    Args:
+        migrator (ContentMigrator): Descriptor of the ISO content type
+        storage_index (StorageIndex): Index of Pulp 2 storage
+    """
+    file_model = migrator.pulp3_content_model
+    total = 0
+    for batch in pulp2_content_batches(migrator.pulp2_content_type, migrator.batch_size):
+        with transaction.atomic():
+            _create_file_content(migrator, file_model, batch)
+        total += len(batch)
+        _logger.debug('File content created for ISO content, processed so far: {total}'.format(
+            total=total))
+
+
+def _create_file_content(migrator, file_model, pulp2_content_batch):
+    """
+    Create File content for a batch of Pulp 2 ISO content and link them together.
+
+    Already existing File content is reused.
+
+    Args:
+        migrator (ContentMigrator): Descriptor of the ISO content type
+        file_model: Pulp 3 File content model, the target of the ISO content type
+        pulp2_content_batch (list): Pulp2Content rows to create File content for
+    """
+    pulp2_ids = [str(pulp2_content.pulp2_id) for pulp2_content in pulp2_content_batch]
+    mongo_content_qs = migrator.pulp2_model.objects(id__in=pulp2_ids).only('id',
+                                                                           *migrator.pulp2_fields)
+    isos = {record['id']: record for record in mongo_content_qs.batch_size(migrator.batch_size)}
+
+    existing_content = {}
+    digests = [iso['checksum'] for iso in isos.values()]
+    for file_content in file_model.objects.filter(digest__in=digests):
+        existing_content[(file_content.relative_path, file_content.digest)] = file_content
+
+    content_artifacts = []
+    for pulp2_content in pulp2_content_batch:
+        iso = isos.get(str(pulp2_content.pulp2_id))
+        if iso is None:
+            _logger.warning('ISO content {id} is not found in Pulp 2.'.format(
+                id=pulp2_content.pulp2_id))
+            continue
+
+        key = (iso['name'], iso['checksum'])
+        file_content = existing_content.get(key)
+        if file_content is None:
+            # multi-table inheritance models can't be bulk created
+            file_content = file_model(relative_path=iso['name'], digest=iso['checksum'])
+            file_content.save()
+            existing_content[key] = file_content
+            content_artifacts.append(ContentArtifact(artifact=None,
+                                                     content=file_content,
+                                                     relative_path=iso['name']))
+        pulp2_content.pulp3_content = file_content
+
+    ContentArtifact.objects.bulk_create(content_artifacts, ignore_conflicts=True)
+    Pulp2Content.objects.bulk_update(pulp2_content_batch, ['pulp3_content'],
+                                     batch_size=UPDATE_BATCH_SIZE)
+
+
+async def migrate_iso_publications(migrator, storage_index):
+    """
+    Coroutine to publish and distribute migrated repositories with ISO content.
+
+    Only Pulp 3 repositories created by the migration are processed. The latest version of each
+    of them is published, unless the publication recorded by the migration is of that version
+    already, so only repositories which changed since the last run are republished. A publication with any unresolved manifest entry is not
+    completed, the other repositories are still processed and the stage fails at the end.
+
+    The stage is not registered for the ISO content type yet, nothing records migrated
+    repositories in Pulp2Repository until repository migration is implemented.
+
+    Args:
+        migrator (ContentMigrator): Descriptor of the ISO content type
+        storage_index (StorageIndex): Index of Pulp 2 storage
+
+    Raises:
+        PublicationError: If any of the repositories failed to be published
+    """
+    content_type = migrator.pulp2_content_type
+    failed_repos = []
+    pulp2_repo_qs = Pulp2Repository.objects.filter(pulp3_repository__isnull=False)
+    pulp2_repo_qs = pulp2_repo_qs.select_related('pulp3_repository', 'pulp3_publication')
+    for pulp2_repo in pulp2_repo_qs.iterator():
+        repository = pulp2_repo.pulp3_repository
+        repo_version = repository.versions.filter(complete=True).order_by('-number').first()
+        if repo_version is None:
+            continue
+
+        pulp2_content_qs = repo_version.content.filter(
+            pulp2content__pulp2_content_type_id=content_type)
+        if not pulp2_content_qs.exists():
+            continue
+
+        publication = pulp2_repo.pulp3_publication
+        if (publication is None or not publication.complete or
+                publication.repository_version_id != repo_version.pk):
+            try:
+                publication = _publish(migrator, repo_version)
+            except PublicationError as exc:
+                _logger.error('Unable to publish {repo}: {error}'.format(
+                    repo=pulp2_repo.pulp2_repo_id, error=exc))
+                failed_repos.append(pulp2_repo.pulp2_repo_id)
+                continue
+            pulp2_repo.pulp3_publication = publication
+            pulp2_repo.save()
+        else:
+            _logger.debug('{repo} version {number} is already published.'.format(
+                repo=repository.name, number=repo_version.number))
+
+        _distribute(pulp2_repo, publication)
+
+    if failed_repos:
+        raise PublicationError(_('Publication failed for repositories: {repos}').format(
+            repos=', '.join(failed_repos)))
+
+
+def _distribute(pulp2_repo, publication):
+    """
+    Distribute a publication of a migrated repository.
+
+    The distribution created by the migration for the repository is updated, a new one is created
+    at a base path equal to the Pulp 2 repository ID otherwise. Existing distributions which were
+    not created by the migration are never changed.
+
+    Args:
+        pulp2_repo (Pulp2Repository): Migrated repository
+        publication (FilePublication): Publication to distribute
+    """
+    if pulp2_repo.pulp3_distribution_id is not None:
+        FileDistribution.objects.filter(pk=pulp2_repo.pulp3_distribution_id).update(
+            publication=publication)
+        return
+
+    name = base_path = pulp2_repo.pulp2_repo_id
+    with transaction.atomic():
+        if BaseDistribution.objects.filter(name=name).exists():
+            _logger.warning('Distribution {name} already exists, {repo} is not distributed.'.format(
+                name=name, repo=pulp2_repo.pulp2_repo_id))
+            return
+
+        distribution, created = FileDistribution.objects.get_or_create(
+            base_path=base_path,
+            defaults={'name': name, 'publication': publication})
+        if not created:
+            _logger.warning('Base path {base_path} is already used by {name} distribution, '
+                            '{repo} is not distributed.'.format(base_path=base_path,
+                                                                name=distribution.name,
+                                                                repo=pulp2_repo.pulp2_repo_id))
+            return
+
+        pulp2_repo.pulp3_distribution = distribution
+        pulp2_repo.save()
+
+
+def _publish(migrator, repo_version):
+    """
+    Create a pass-through publication with a PULP_MANIFEST for a repository version.
+
+    The manifest is written while File content is streamed from the database, content of
+    a repository version is never loaded into memory at once. If the manifest can't be written,
+    the publication is not completed.
+
+    Args:
+        migrator (ContentMigrator): Descriptor of the ISO content type
+        repo_version (pulpcore.plugin.models.RepositoryVersion): Repository version to publish
+
+    Returns:
+        FilePublication: The created publication
+
+    Raises:
+        PublicationError: If any of the manifest entries can't be resolved
+    """
+    _logger.debug('Publishing {repo} version {number}.'.format(
+        repo=repo_version.repository.name, number=repo_version.number))
+
+    with FilePublication.create(repo_version, pass_through=True) as publication:
+        publication.manifest = MANIFEST_NAME
+        manifest = Manifest(MANIFEST_NAME)
+        manifest.write(_manifest_entries(migrator, repo_version))
+        with open(manifest.relative_path, 'rb') as manifest_file:
+            PublishedMetadata.create_from_file(file=File(manifest_file), publication=publication)
+    return publication
+
+
+def _manifest_entries(migrator, repo_version):
+    """
+    Stream PULP_MANIFEST entries for File content in a repository version.
+
+    Sizes of files are read from Pulp 2 in batches.
+
+    Args:
+        migrator (ContentMigrator): Descriptor of the ISO content type
+        repo_version (pulpcore.plugin.models.RepositoryVersion): Repository version to publish
+
+    Yields:
+        Entry: A manifest entry for a file
+
+    Raises:
+        PublicationError: If File content is not migrated from Pulp 2 or its size is unknown
+    """
+    file_content_qs = FileContent.objects.filter(pk__in=repo_version.content).order_by('pk')
+    file_content_qs = file_content_qs.values_list('pk',
+                                                  'relative_path',
+                                                  'digest',
+                                                  'pulp2content__pulp2_id')
+    batch = []
+    last_pk = None
+    for pk, relative_path, digest, pulp2_id in file_content_qs.iterator(
+            chunk_size=migrator.batch_size):
+        # File content can be linked to more than one Pulp 2 unit
+        if pk == last_pk:
+            continue
+        last_pk = pk
+
+        if pulp2_id is None:
+            raise PublicationError(_('{path} is not migrated from Pulp 2.').format(
+                path=relative_path))
+        batch.append((relative_path, digest, str(pulp2_id)))
+        if len(batch) == migrator.batch_size:
+            yield from _resolve_entries(migrator, batch)
+            batch = []
+
+    yield from _resolve_entries(migrator, batch)
+
+
+def _resolve_entries(migrator, batch):
+    """
+    Create manifest entries for a batch of files with their sizes from Pulp 2.
+
+    Args:
+        migrator (ContentMigrator): Descriptor of the ISO content type
+        batch (list): (relative_path, digest, pulp2_id) tuples of files
+
+    Yields:
+        Entry: A manifest entry for a file
+
+    Raises:
+        PublicationError: If a size of a file is unknown
+    """
+    if not batch:
+        return
+
+    pulp2_ids = [pulp2_id for _relative_path, _digest, pulp2_id in batch]
+    mongo_content_qs = migrator.pulp2_model.objects(id__in=pulp2_ids).only('id', 'size')
+    sizes = {record['id']: record['size'] for record in mongo_content_qs}
+
+    for relative_path, digest, pulp2_id in batch:
+        size = sizes.get(pulp2_id)
+        if size is None:
+            raise PublicationError(_('Size of {path} is unknown in Pulp 2.').format(
+                path=relative_path))
+        yield Entry(relative_path=relative_path, digest=digest, size=size)
@@ -31,6 +31,9 @@ setup(
     entry_points={
         'pulpcore.plugin': [
             'pulp_2to3_migrate = pulp_2to3_migrate:default_app_config',
-        ]
+        ],
+        'pulp_2to3_migrate.migrators': [
+            'iso = pulp_2to3_migrate.pulp2.iso.migrators:MIGRATORS',
+        ],
     }
 )